@@ -11,16 +11,11 @@ marks    - points awarded for a sheet or exercise
 """
 
 import logging
-import os
 import sys
 
 from . import config, parsers, utils
 
 
-# Might be necessary to make colored output work on Windows.
-os.system("")
-
-
 def main():
     utils.configure_logging()
 
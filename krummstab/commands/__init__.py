@@ -1,9 +1,4 @@
-from .check import check
-from .collect import collect
-from .combine import combine
-from .init import init
-from .mark import mark
-from .send import send
-from .summarize import summarize
-
+# The command modules are imported on demand by parsers.import_command, such
+# that running a single command does not pay for the dependencies of all the
+# others.
 __all__ = ["check", "collect", "combine", "init", "mark", "send", "summarize"]
@@ -37,22 +37,28 @@ def warn_about_restructured_teams(
         "in the config."
     )
     print(strings.SEPARATOR_LINE)
+    email_to_config_team_indices = defaultdict(list)
+    for index, config_team in enumerate(config_teams):
+        for member in config_team:
+            email_to_config_team_indices[member.email].append(index)
     for restructured_team in restructured_teams:
         print(f"{restructured_team}\n")
         # Get config teams that share a member with the submission team.
-        matching_config_teams = [
-            config_team
-            for config_team in config_teams
-            if any(member in config_team for member in restructured_team)
-        ]
-        if matching_config_teams:
+        matching_indices = sorted(
+            {
+                index
+                for member in restructured_team
+                for index in email_to_config_team_indices.get(member.email, [])
+            }
+        )
+        if matching_indices:
             print("Matching config team(s):")
-            for matching_team in matching_config_teams:
-                print(f"* {matching_team}")
+            for index in matching_indices:
+                print(f"* {config_teams[index]}")
         new_students = [
             member
             for member in restructured_team
-            if not any(member in config_team for config_team in config_teams)
+            if member.email not in email_to_config_team_indices
         ]
         if new_students:
             print(
@@ -73,17 +79,17 @@ def check_team_consistency(
     the teams that submitted `submission_teams` and prints warnings in case of
     inconsistencies.
     """
+    # Members of a team are sorted by email, so the tuple of emails identifies
+    # the team in the same way as Team.__eq__.
+    config_team_emails = {tuple(team.get_emails()) for team in config_teams}
+    config_emails = {email for team in config_team_emails for email in team}
     # Get teams that submitted but are not in the config and contain at least
     # one member that is mentioned in the config.
     restructured_teams = [
         submission_team
         for submission_team in submission_teams
-        if submission_team not in config_teams
-        and any(
-            member in config_team
-            for member in submission_team
-            for config_team in config_teams
-        )
+        if tuple(submission_team.get_emails()) not in config_team_emails
+        and any(member.email in config_emails for member in submission_team)
     ]
     if restructured_teams:
         warn_about_restructured_teams(config_teams, restructured_teams)
@@ -92,11 +98,7 @@ def check_team_consistency(
     new_teams = [
         submission_team
         for submission_team in submission_teams
-        if all(
-            member not in config_team
-            for member in submission_team
-            for config_team in config_teams
-        )
+        if all(member.email not in config_emails for member in submission_team)
     ]
     if new_teams:
         logging.warning(
@@ -135,7 +137,7 @@ def check(_the_config: config.Config, args) -> None:
         if len(children) != 1 or not children[0].is_dir():
             errors.unexpected_zip_structure(args.adam_zip_path)
         temp_sheet_root_dir = children[0]
-        grand_children = list(pathlib.Path(temp_sheet_root_dir).iterdir())
+        grand_children = list(temp_sheet_root_dir.iterdir())
         # Within its single subdirectory, we expect the zip to contain a
         # single subsubdirectory named either "Abgaben" or "Submissions" and
         # a single spreadsheet with information about the submissions.
@@ -171,9 +173,9 @@ def check(_the_config: config.Config, args) -> None:
     )
     tutor_assignment_count = defaultdict(int)
     tutor_assignment_count["total"] = len(submission_teams)
-    for _, tutors in team_to_tutors.items():
+    for tutors in team_to_tutors.values():
         if len(tutors) == 1:
-            tutor_assignment_count[list(tutors)[0]] += 1
+            tutor_assignment_count[next(iter(tutors))] += 1
         elif len(tutors) == len(tutor_list):
             tutor_assignment_count["unassigned"] += 1
         else:
@@ -1,17 +1,20 @@
-import gzip
-import json
+import io
 import logging
+import os
 import pathlib
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZipFile
 
 from .. import config, sheets, submissions, strings, utils
 
 
 def validate_marks_json(
-    _the_config: config.Config, sheet: sheets.Sheet
+    _the_config: config.Config,
+    sheet: sheets.Sheet,
+    relevant_submissions: list[submissions.Submission],
 ) -> None:
     """
     Verify that all necessary marks are present in the MARK_FILE_NAME file and
@@ -24,7 +27,7 @@ def validate_marks_json(
         )
     marks = utils.read_json(marks_json_file)
     relevant_teams = []
-    for submission in sheet.get_relevant_submissions():
+    for submission in relevant_submissions:
         relevant_teams.append(submission.team.get_team_key())
     marked_teams = list(marks.keys())
     if sorted(relevant_teams) != sorted(marked_teams):
@@ -81,13 +84,15 @@ def collect_feedback_files(
     submission: submissions.Submission,
     _the_config: config.Config,
     sheet: sheets.Sheet,
-) -> None:
+) -> list[str]:
     """
     Take the contents of a {team_dir}/feedback directory and collect the files
     that actually contain feedback (e.g., no .xopp files). If there are
     multiple, add them to a zip archive and save it to
     {team_dir}/feedback_collected. If there is only a single pdf, copy it to
-    {team_dir}/feedback_collected.
+    {team_dir}/feedback_collected. Returns the warnings that occurred instead
+    of logging them, such that the caller can print them in a deterministic
+    order.
     """
     feedback_dir = submission.get_feedback_dir()
     collected_feedback_dir = submission.get_collected_feedback_dir()
@@ -100,19 +105,18 @@ def collect_feedback_files(
             f"Missing feedback directory for team {submission.root_dir.name}!"
         )
     # The directory for collected feedback should exist and be empty. Either it
-    # was created new, or the user chose to overwrite and previously existing
-    # directories have been removed and replaced by empty ones.
+    # was created new, or the user chose to overwrite and
+    # prepare_collected_feedback_directories emptied it in place.
     assert collected_feedback_dir.is_dir() and not any(
         collected_feedback_dir.iterdir()
     )
     # Create list of feedback files. Those are all files in the feedback
     # directory which are not hidden and do not have an ignored suffix.
+    ignored_suffixes = frozenset(_the_config.ignore_feedback_suffix)
     feedback_files = [
         file
-        for file in feedback_dir.rglob("*")
-        if file.is_file()
-        and not utils.is_hidden_path(file)
-        and file.suffix not in _the_config.ignore_feedback_suffix
+        for file in utils.iterate_files(feedback_dir, skip_hidden=True)
+        if file.suffix not in ignored_suffixes
     ]
     if not feedback_files:
         logging.critical(
@@ -122,69 +126,107 @@ def collect_feedback_files(
     # If there is exactly one pdf in the feedback directory, we do not need to
     # create a zip archive.
     if len(feedback_files) == 1 and feedback_files[0].suffix == ".pdf":
-        shutil.copy(feedback_files[0], collected_feedback_dir)
-        return
-    # Otherwise, zip up feedback files.
+        utils.copy_file(feedback_files[0], collected_feedback_dir)
+        return []
+    # Otherwise, zip up feedback files. The archive is written next to the
+    # collected feedback directory first and only moved into it once it is
+    # complete, so an interrupted run never leaves a truncated archive behind.
     feedback_contains_pdf = False
-    with ZipFile(
-        collected_feedback_dir / collected_feedback_zip_name, "w"
-    ) as zip_file:
+    partial_zip_path = submission.root_dir / (
+        collected_feedback_zip_name + ".part"
+    )
+    with (
+        open(
+            partial_zip_path, "wb", buffering=utils.ZIP_WRITE_BUFFER_SIZE
+        ) as partial_zip_file,
+        ZipFile(
+            partial_zip_file,
+            "w",
+            compression=ZIP_DEFLATED,
+            compresslevel=1,
+        ) as zip_file,
+    ):
         for file_to_zip in feedback_files:
             if file_to_zip.suffix == ".pdf":
                 feedback_contains_pdf = True
             zip_file.write(
-                file_to_zip, arcname=file_to_zip.relative_to(feedback_dir)
+                file_to_zip,
+                arcname=file_to_zip.relative_to(feedback_dir),
+                compress_type=utils.get_zip_compress_type(file_to_zip),
             )
+    os.replace(
+        partial_zip_path, collected_feedback_dir / collected_feedback_zip_name
+    )
+    warnings = []
     if not feedback_contains_pdf:
-        logging.warning(
+        warnings.append(
             f"The feedback for {submission.root_dir.name} contains no PDF file!"
         )
+    return warnings
 
 
-def delete_collected_feedback_directories(sheet: sheets.Sheet) -> None:
+def contains_collected_feedback(submission: submissions.Submission) -> bool:
     """
-    Removes existing collected feedback directories. Does not care about
-    non-existing ones.
+    Check whether the collected feedback directory of the team exists and is
+    not empty, opening the directory only once.
     """
-    for submission in sheet.get_relevant_submissions():
-        collected_feedback_dir = submission.get_collected_feedback_dir()
-        shutil.rmtree(collected_feedback_dir, ignore_errors=True)
+    try:
+        with os.scandir(submission.get_collected_feedback_dir()) as entries:
+            return next(entries, None) is not None
+    except (FileNotFoundError, NotADirectoryError):
+        return False
 
 
-def create_collected_feedback_directories(sheet: sheets.Sheet) -> None:
+def prepare_collected_feedback_directories(
+    relevant_submissions: list[submissions.Submission],
+) -> None:
     """
-    Create an empty directory in each relevant team directory. The collected
-    feedback will be saved to these directories.
+    Make sure there is an empty directory in each relevant team directory. The
+    collected feedback will be saved to these directories. Existing directories
+    are emptied instead of being removed and created again, the user has
+    agreed to overwrite their content at this point.
     """
-    for submission in sheet.get_relevant_submissions():
+    for submission in relevant_submissions:
         collected_feedback_dir = submission.get_collected_feedback_dir()
-        assert not collected_feedback_dir.is_dir() or not any(
-            collected_feedback_dir.iterdir()
-        )
-        collected_feedback_dir.mkdir(exist_ok=True)
+        if not collected_feedback_dir.is_dir():
+            collected_feedback_dir.mkdir()
+            continue
+        for path in collected_feedback_dir.iterdir():
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+
+
+GZIP_MAGIC_NUMBER = b"\x1f\x8b"
 
 
 def is_gzipped(filename: pathlib.Path) -> bool:
     """
-    Checks if a file is gzipped.
+    Checks if a file is gzipped by looking at its magic number, without
+    decompressing any of its content.
     """
-    try:
-        with gzip.open(filename, "rb") as f:
-            f.read(1)
-        return True
-    except OSError:
-        return False
+    with open(filename, "rb") as f:
+        return f.read(len(GZIP_MAGIC_NUMBER)) == GZIP_MAGIC_NUMBER
 
 
-def export_xopp_files(sheet: sheets.Sheet) -> None:
+def export_xopp_files(
+    relevant_submissions: list[submissions.Submission],
+) -> None:
     """
     Exports all xopp feedback files.
     """
     logging.info("Exporting .xopp files...")
-    for submission in sheet.get_relevant_submissions():
+    commands = []
+    for submission in relevant_submissions:
         feedback_dir = submission.get_feedback_dir()
+        # A missing feedback directory is reported when collecting feedback.
+        if not feedback_dir.is_dir():
+            continue
         xopp_files = [
-            file for file in feedback_dir.rglob("*") if file.suffix == ".xopp"
+            file
+            for file in utils.iterate_files(feedback_dir)
+            if file.suffix == ".xopp"
         ]
         for xopp_file in xopp_files:
             if not is_gzipped(xopp_file):
@@ -193,19 +235,25 @@ def export_xopp_files(sheet: sheets.Sheet) -> None:
                     "Xournal++. It does not contain any feedback."
                 )
             dest = xopp_file.with_suffix(".pdf")
-            subprocess.run(["xournalpp", "-p", dest, xopp_file])
+            commands.append(["xournalpp", "-p", dest, xopp_file])
+    # Every export runs in its own Xournal++ process, so we can run several of
+    # them at once. The threads only wait for the processes to finish.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(subprocess.run, commands))
     logging.info("Done exporting .xopp files.")
 
 
 def create_individual_marks_file(
-    _the_config: config.Config, sheet: sheets.Sheet
+    _the_config: config.Config,
+    sheet: sheets.Sheet,
+    relevant_submissions: list[submissions.Submission],
 ) -> None:
     """
     Write a json file to add the marks per student.
     """
     team_marks = utils.read_json(sheet.get_marks_file_path(_the_config))
     student_marks = {}
-    for submission in sheet.get_relevant_submissions():
+    for submission in relevant_submissions:
         team_key = submission.team.get_team_key()
         for student in submission.team.members:
             student_key = student.email.lower()
@@ -221,16 +269,15 @@ def create_individual_marks_file(
         and _the_config.marking_mode == "exercise"
     ):
         file_content["exercises"] = sheet.exercises
-    with open(
-        sheet.get_individual_marks_file_path(_the_config),
-        "w",
-        encoding="utf-8",
-    ) as file:
-        json.dump(file_content, file, indent=4, ensure_ascii=False)
+    utils.write_json(
+        sheet.get_individual_marks_file_path(_the_config), file_content
+    )
 
 
 def create_share_archive(
-    overwrite: Optional[bool], sheet: sheets.Sheet
+    overwrite: Optional[bool],
+    sheet: sheets.Sheet,
+    relevant_submissions: list[submissions.Submission],
 ) -> None:
     """
     In case the marking mode is exercise, the final feedback the teams get is
@@ -278,28 +325,28 @@ def create_share_archive(
     # │   ├── feedback_tutor1_ex1.pdf
     # │   └── feedback_tutor1_ex1_code_submission.cc
     # └── ...
-    with ZipFile(share_archive_file, "w") as zip_file:
+    with (
+        open(
+            share_archive_file, "wb", buffering=utils.ZIP_WRITE_BUFFER_SIZE
+        ) as share_archive,
+        ZipFile(share_archive, "w") as zip_file,
+    ):
         # The relevant team directories should always be *all* team directories
         # here, because we only need share archives for the 'exercise' marking
         # mode.
-        for submission in sheet.get_relevant_submissions():
+        for submission in relevant_submissions:
             collected_feedback_file = submission.get_collected_feedback_path()
             sub_zip_name = f"{submission.root_dir.name}.zip"
             if collected_feedback_file.suffix == ".pdf":
-                # Create a temporary zip file in the collected feedback
-                # directory and add the single pdf.
-                temp_zip_file = (
-                    submission.get_collected_feedback_dir() / "temp_zip.zip"
-                )
-                with ZipFile(temp_zip_file, "w") as temp_zip:
-                    temp_zip.write(
+                # Build a zip archive containing the single pdf in memory and
+                # add it to the share archive.
+                sub_zip_buffer = io.BytesIO()
+                with ZipFile(sub_zip_buffer, "w") as sub_zip:
+                    sub_zip.write(
                         collected_feedback_file,
                         arcname=collected_feedback_file.name,
                     )
-                # Add the temporary zip file to the share archive.
-                zip_file.write(temp_zip_file, arcname=sub_zip_name)
-                # Remove the temporary zip file.
-                temp_zip_file.unlink()
+                zip_file.writestr(sub_zip_name, sub_zip_buffer.getvalue())
             elif collected_feedback_file.suffix == ".zip":
                 zip_file.write(collected_feedback_file, arcname=sub_zip_name)
             else:
@@ -316,14 +363,15 @@ def collect(_the_config: config.Config, args) -> None:
     """
     # Prepare.
     sheet = sheets.Sheet(args.sheet_root_dir)
+    # Read the submission info of all teams once instead of in every step.
+    relevant_submissions = list(sheet.get_relevant_submissions())
     # Collect feedback.
 
     # Check if there is a collected feedback directory with files inside
     # already.
     collected_feedback_exists = any(
-        (submission.get_collected_feedback_dir()).is_dir()
-        and any((submission.get_collected_feedback_dir()).iterdir())
-        for submission in sheet.get_relevant_submissions()
+        contains_collected_feedback(submission)
+        for submission in relevant_submissions
     )
     # Ask the user whether collected feedback should be overwritten in case it
     # exists already.
@@ -336,19 +384,27 @@ def collect(_the_config: config.Config, args) -> None:
             ),
             default=False,
         )
-        if overwrite:
-            delete_collected_feedback_directories(sheet)
-        else:
+        if not overwrite:
             logging.critical(
                 "Aborting 'collect' without overwriting existing collected feedback."
             )
     if _the_config.xopp:
-        export_xopp_files(sheet)
-    create_collected_feedback_directories(sheet)
-    for submission in sheet.get_relevant_submissions():
-        collect_feedback_files(submission, _the_config, sheet)
+        export_xopp_files(relevant_submissions)
+    prepare_collected_feedback_directories(relevant_submissions)
+    # The feedback of different teams is independent, and both file I/O and
+    # compression release the GIL, so we collect it for multiple teams at once.
+    # The first failing team stops the collection of the remaining ones.
+    # Warnings are logged afterwards in the order of the teams.
+    for warnings in utils.run_concurrently(
+        lambda submission: collect_feedback_files(
+            submission, _the_config, sheet
+        ),
+        relevant_submissions,
+    ):
+        for warning in warnings:
+            logging.warning(warning)
     if _the_config.marking_mode == "exercise":
-        create_share_archive(overwrite, sheet)
+        create_share_archive(overwrite, sheet, relevant_submissions)
     if _the_config.use_marks_file:
-        validate_marks_json(_the_config, sheet)
-        create_individual_marks_file(_the_config, sheet)
+        validate_marks_json(_the_config, sheet, relevant_submissions)
+        create_individual_marks_file(_the_config, sheet, relevant_submissions)
@@ -1,7 +1,7 @@
+import io
 import logging
-import pathlib
 import shutil
-from zipfile import ZipFile
+from zipfile import ZipFile, ZipInfo
 
 from .. import config, sheets, utils
 
@@ -14,17 +14,17 @@ def combine(_the_config: config.Config, args) -> None:
     # Prepare.
     sheet = sheets.Sheet(args.sheet_root_dir)
 
-    share_archive_files = sheet.get_share_archive_files()
+    share_archive_files = list(sheet.get_share_archive_files())
     instructions = (
         "Run `collect` to generate the share archive for your own feedback and"
         " save the share archives you received from the other tutors under"
         f" {sheet.root_dir}."
     )
-    if len(list(share_archive_files)) == 0:
+    if len(share_archive_files) == 0:
         logging.critical(
             f"No share archives exist in {sheet.root_dir}. " + instructions
         )
-    if len(list(share_archive_files)) == 1:
+    if len(share_archive_files) == 1:
         logging.warning(
             "Only a single share archive is being combined. " + instructions
         )
@@ -55,8 +55,12 @@ def combine(_the_config: config.Config, args) -> None:
     # └── feedback_combined
 
     # Create subdirectories for teams.
-    for submission in sheet.get_relevant_submissions():
-        combined_team_dir = combined_dir / submission.root_dir.name
+    teams_all = [
+        submission.root_dir.name
+        for submission in sheet.get_relevant_submissions()
+    ]
+    combined_team_dirs = {team: combined_dir / team for team in teams_all}
+    for combined_team_dir in combined_team_dirs.values():
         combined_team_dir.mkdir()
 
     # Structure at this point:
@@ -65,32 +69,43 @@ def combine(_the_config: config.Config, args) -> None:
     #     ├── 12345_Muster-Meier-Mueller
     #     .
 
-    teams_all = [
-        submission.root_dir.name
-        for submission in sheet.get_relevant_submissions()
-    ]
     # Extract feedback files from share archives into their respective team
     # directories in the combined directory.
-    for share_archive_file in sheet.get_share_archive_files():
+    for share_archive_file in share_archive_files:
         with ZipFile(share_archive_file, mode="r") as share_archive:
             # Check if this share archive is missing team archives for any team.
-            teams_present = [
-                pathlib.Path(team).stem for team in share_archive.namelist()
+            # Share archive entries are named <team>.zip, so stripping the
+            # suffix is enough to get the team name.
+            team_archive_infos = {
+                info.filename.removesuffix(".zip"): info
+                for info in share_archive.infolist()
+            }
+            teams_not_present = [
+                team for team in teams_all if team not in team_archive_infos
             ]
-            teams_not_present = list(set(teams_all) - set(teams_present))
             for team_not_present in teams_not_present:
                 logging.warning(
                     f"The shared archive {share_archive_file} contains no"
                     f" feedback for team {team_not_present}."
                 )
-            for team in teams_present:
-                # Extract team_archive from share_archive.
-                team_archive_file = share_archive.extract(
-                    team + ".zip", combined_dir / team
-                )
-                with ZipFile(team_archive_file, mode="r") as team_archive:
-                    team_archive.extractall(path=combined_dir / team)
-                pathlib.Path(team_archive_file).unlink()
+            for team, team_archive_info in team_archive_infos.items():
+                # Teams that are not relevant according to the submission info
+                # get their directory on first use; every other directory was
+                # created above.
+                combined_team_dir = combined_team_dirs.get(team)
+                if combined_team_dir is None:
+                    combined_team_dir = combined_dir / team
+                    combined_team_dir.mkdir()
+                    combined_team_dirs[team] = combined_team_dir
+                # Read team_archive from share_archive into memory instead of
+                # extracting it to disk first. Team archives are small, and
+                # ZipFile seeks back and forth in its input, which is slow on
+                # a stream from another zip archive.
+                team_archive_data = share_archive.read(team_archive_info)
+                with ZipFile(
+                    io.BytesIO(team_archive_data), mode="r"
+                ) as team_archive:
+                    team_archive.extractall(path=combined_team_dir)
 
     """
     I think the step above already accomplishes what this step is supposed to
@@ -133,9 +148,22 @@ def combine(_the_config: config.Config, args) -> None:
         combined_team_archive = team_dir / (
             sheet.get_combined_feedback_file_name() + ".zip"
         )
-        with ZipFile(combined_team_archive, mode="w") as combined_zip:
+        with (
+            open(
+                combined_team_archive,
+                "wb",
+                buffering=utils.ZIP_WRITE_BUFFER_SIZE,
+            ) as combined_team_archive_file,
+            ZipFile(combined_team_archive_file, mode="w") as combined_zip,
+        ):
             for feedback_file in feedback_files:
-                combined_zip.write(feedback_file, arcname=feedback_file.name)
+                # Feedback files are small, so read each one at once instead of
+                # letting ZipFile.write copy it in 8 KiB chunks. The ZipInfo
+                # keeps the file's timestamp and permissions.
+                combined_zip.writestr(
+                    ZipInfo.from_file(feedback_file, feedback_file.name),
+                    feedback_file.read_bytes(),
+                )
                 feedback_file.unlink()
 
     # Structure at this point:
@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 import pathlib
@@ -6,12 +5,37 @@ import shutil
 import tempfile
 import textwrap
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Union
 from zipfile import ZipFile
 
 from .. import config, errors, sheets, strings, submissions, utils
 from ..teams import Team, create_email_to_name_dict
 
+# Templates for the parts of a .xopp file generated by `generate_xopp_files`.
+XOPP_HEADER = textwrap.dedent(
+    """\
+    <?xml version="1.0" standalone="no"?>
+    <xournal creator="Xournal++ 1.1.1" fileversion="4">
+    <title>Xournal++ document - see https://github.com/xournalpp/xournalpp</title>
+    """  # noqa
+)
+XOPP_FIRST_PAGE = textwrap.dedent(
+    """\
+    <page width="{width}" height="{height}">
+    <background type="pdf" domain="absolute" filename="{pdf_file}" pageno="{page_number}"/>
+    <layer/>
+    </page>"""  # noqa
+)
+XOPP_PAGE = textwrap.dedent(
+    """\
+    <page width="{width}" height="{height}">
+    <background type="pdf" pageno="{page_number}"/>
+    <layer/>
+    </page>"""
+)
+XOPP_FOOTER = "</xournal>"
+
 
 def extract_adam_zip(args) -> tuple[pathlib.Path, str]:
     """
@@ -20,7 +44,17 @@ def extract_adam_zip(args) -> tuple[pathlib.Path, str]:
     assume that the structure of the zip file is as expected because `check`
     should have verified that already at this point.
     """
-    with tempfile.TemporaryDirectory() as temp_dir:
+    # Extract into a temporary directory next to the final location, such that
+    # moving the extracted files there is a rename instead of a second copy of
+    # every submission when the system's temporary directory is on a different
+    # file system.
+    temp_parent = (
+        pathlib.Path(args.target).parent if args.target else pathlib.Path()
+    )
+    temp_parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(
+        prefix=utils.STAGING_DIR_PREFIX, dir=temp_parent
+    ) as temp_dir:
         utils.unzip_or_move_adam_zip(args.adam_zip_path, temp_dir)
         temp_sheet_root_dir = list(pathlib.Path(temp_dir).iterdir())[0]
         adam_sheet_name = temp_sheet_root_dir.name
@@ -53,13 +87,14 @@ def mark_irrelevant_team_dirs(
     Indicate which team directories do not have to be marked by adding the
     `DO_NOT_MARK_PREFIX` to their directory name.
     """
+    # The team directories stay within the sheet root directory, so a plain
+    # rename suffices and the extra checks of shutil.move are not needed.
     for submission in sheet.get_all_team_submission_info():
         if not submission.relevant:
-            shutil.move(
-                submission.root_dir,
+            submission.root_dir.rename(
                 submission.root_dir.with_name(
                     strings.DO_NOT_MARK_PREFIX + submission.root_dir.name
-                ),
+                )
             )
 
 
@@ -70,9 +105,26 @@ def rename_team_dirs(sheet: sheets.Sheet) -> None:
     """
     for submission in sheet.get_all_team_submission_info():
         team_key = submission.team.get_team_key()
-        shutil.move(
-            submission.root_dir, submission.root_dir.with_name(team_key)
-        )
+        submission.root_dir.rename(submission.root_dir.with_name(team_key))
+
+
+def list_submission_entries(team_dir: pathlib.Path) -> list[os.DirEntry]:
+    """
+    Return the entries of the team directory except for the submission info
+    file. os.scandir provides the file type of each entry along with its name,
+    so checking whether an entry is a directory needs no additional stat call.
+    """
+    with os.scandir(team_dir) as entries:
+        return [
+            entry
+            for entry in entries
+            if entry.name != strings.SUBMISSION_INFO_FILE_NAME
+        ]
+
+
+def is_empty_dir(path: str) -> bool:
+    with os.scandir(path) as entries:
+        return next(entries, None) is None
 
 
 def flatten_team_dirs(sheet: sheets.Sheet) -> None:
@@ -84,21 +136,16 @@ def flatten_team_dirs(sheet: sheets.Sheet) -> None:
     them next to each other and print a warning.
     """
     for submission in sheet.get_all_team_submission_info():
-        # Remove empty subdirectories.
-        for team_submission_dir in submission.root_dir.iterdir():
-            if (
-                team_submission_dir.is_dir()
-                and len(list(team_submission_dir.iterdir())) == 0
-            ):
-                team_submission_dir.rmdir()
         # Store the list of team submission directories in variable, because the
         # generator may include subdirectories of team submission directories
-        # that have already been flattened.
-        team_submission_dirs = [
-            path
-            for path in submission.root_dir.iterdir()
-            if not path.name == strings.SUBMISSION_INFO_FILE_NAME
-        ]
+        # that have already been flattened. Empty subdirectories are removed
+        # in the same pass.
+        team_submission_dirs = []
+        for entry in list_submission_entries(submission.root_dir):
+            if entry.is_dir() and is_empty_dir(entry.path):
+                os.rmdir(entry.path)
+            else:
+                team_submission_dirs.append(entry)
         if len(team_submission_dirs) > 1:
             logging.warning(
                 "There are multiple submissions for group "
@@ -112,10 +159,33 @@ def flatten_team_dirs(sheet: sheets.Sheet) -> None:
         for team_submission_dir in team_submission_dirs:
             if team_submission_dir.is_dir():
                 utils.move_content_and_delete(
-                    team_submission_dir, submission.root_dir
+                    pathlib.Path(team_submission_dir.path), submission.root_dir
                 )
 
 
+def unzip_internal_zips_of_submission(
+    submission: submissions.Submission,
+) -> None:
+    """
+    Extract the zip files in the directory of a single team and flatten it.
+    """
+    zip_files = [
+        file
+        for file in utils.iterate_files(submission.root_dir)
+        if file.suffix == ".zip"
+    ]
+    for zip_file in zip_files:
+        with ZipFile(zip_file, mode="r") as zf:
+            utils.filtered_extract(zf, zip_file.parent)
+        os.remove(zip_file)
+    sub_dirs = list_submission_entries(submission.root_dir)
+    while len(sub_dirs) == 1 and sub_dirs[0].is_dir():
+        utils.move_content_and_delete(
+            pathlib.Path(sub_dirs[0].path), submission.root_dir
+        )
+        sub_dirs = list_submission_entries(submission.root_dir)
+
+
 def unzip_internal_zips(sheet: sheets.Sheet) -> None:
     """
     If multiple files are uploaded to ADAM, the submission becomes a single zip
@@ -123,23 +193,13 @@ def unzip_internal_zips(sheet: sheets.Sheet) -> None:
     extracted. Additionally, we flatten the directory as long as a level only
     consists of a single directory.
     """
-    for submission in sheet.get_all_team_submission_info():
-        for zip_file in submission.root_dir.glob("**/*.zip"):
-            with ZipFile(zip_file, mode="r") as zf:
-                utils.filtered_extract(zf, zip_file.parent)
-            os.remove(zip_file)
-        sub_dirs = [
-            path
-            for path in submission.root_dir.iterdir()
-            if not path.name == strings.SUBMISSION_INFO_FILE_NAME
-        ]
-        while len(sub_dirs) == 1 and sub_dirs[0].is_dir():
-            utils.move_content_and_delete(sub_dirs[0], submission.root_dir)
-            sub_dirs = [
-                path
-                for path in submission.root_dir.iterdir()
-                if not path.name == strings.SUBMISSION_INFO_FILE_NAME
-            ]
+    # Team directories are independent and decompression releases the GIL, so
+    # we extract the zips of multiple teams at once. The first failing team
+    # stops the extraction of the remaining ones.
+    utils.run_concurrently(
+        unzip_internal_zips_of_submission,
+        sheet.get_all_team_submission_info(),
+    )
 
 
 def create_marks_file(
@@ -164,10 +224,7 @@ def create_marks_file(
         team_key = submission.team.get_team_key()
         marks_dict.update({team_key: exercise_dict})
 
-    with open(
-        sheet.get_marks_file_path(_the_config), "w", encoding="utf-8"
-    ) as marks_json:
-        json.dump(marks_dict, marks_json, indent=4, ensure_ascii=False)
+    utils.write_json(sheet.get_marks_file_path(_the_config), marks_dict)
 
 
 def create_feedback_directories(
@@ -180,23 +237,23 @@ def create_feedback_directories(
     names as submitted. The idea is that feedback can be added to these
     copies directly and files without feedback can simply be deleted.
     """
+    feedback_file_name = sheet.get_feedback_file_name(_the_config)
     for submission in sheet.get_relevant_submissions():
         feedback_dir = submission.get_feedback_dir()
         feedback_dir.mkdir()
 
-        feedback_file_name = sheet.get_feedback_file_name(_the_config)
         if not _the_config.xopp:
             feedback_pdf_name = feedback_file_name + ".pdf"
             pdf_files = list(submission.root_dir.glob("*.pdf"))
             if len(pdf_files) == 1:
-                shutil.copy(pdf_files[0], feedback_dir / feedback_pdf_name)
+                utils.copy_file(pdf_files[0], feedback_dir / feedback_pdf_name)
             elif len(pdf_files) > 1:
                 logging.warning(
                     f"There are multiple PDFs in the "
                     f"submission directory {submission.root_dir}."
                 )
                 for pdf in pdf_files:
-                    shutil.copy(pdf, feedback_dir)
+                    utils.copy_file(pdf, feedback_dir)
 
         # Copy non-pdf submission files into feedback directory with added
         # prefix.
@@ -211,11 +268,62 @@ def create_feedback_directories(
                 this_feedback_file_name = (
                     feedback_file_name + "_" + submission_file.name
                 )
-                shutil.copy(
+                utils.copy_file(
                     submission_file, feedback_dir / this_feedback_file_name
                 )
 
 
+def generate_xopp_files_for_submission(
+    submission: submissions.Submission, feedback_file_name: str
+) -> list[str]:
+    """
+    Generate xopp files in the feedback directory of a single team. Returns
+    the warnings that occurred instead of logging them, such that the caller
+    can print them in a deterministic order.
+    """
+    from pypdf import PdfReader
+
+    warnings = []
+    feedback_dir = submission.get_feedback_dir()
+    pdf_paths = list(submission.root_dir.glob("*.pdf"))
+    if len(pdf_paths) > 1:
+        warnings.append(
+            "There are multiple PDFs in the submission directory "
+            f"{submission.root_dir}."
+        )
+    for pdf_path in pdf_paths:
+        xopp_name = pdf_path.stem + ".xopp"
+        if len(pdf_paths) == 1:
+            xopp_name = feedback_file_name + ".xopp"
+        xopp_path = feedback_dir / xopp_name
+        if xopp_path.is_file():
+            warnings.append(
+                "Skipping .xopp file generation for "
+                f"{submission.root_dir.name}: xopp file exists."
+            )
+            continue
+        pages = PdfReader(pdf_path).pages
+        # Assemble the whole file in memory and write it at once.
+        pdf_file = pdf_path.resolve()
+        parts = [XOPP_HEADER]
+        for i, page in enumerate(pages, start=1):
+            template = XOPP_FIRST_PAGE if i == 1 else XOPP_PAGE
+            # Looking up the media box may walk up the page tree, so only do
+            # it once per page.
+            mediabox = page.mediabox
+            parts.append(
+                template.format(
+                    width=mediabox.width,
+                    height=mediabox.height,
+                    pdf_file=pdf_file,
+                    page_number=i,
+                )
+            )
+        parts.append(XOPP_FOOTER)
+        xopp_path.write_text("".join(parts), encoding="utf-8")
+    return warnings
+
+
 def generate_xopp_files(
     sheet: sheets.Sheet, _the_config: config.Config
 ) -> None:
@@ -223,59 +331,18 @@ def generate_xopp_files(
     Generate xopp files in the feedback directories that point to the pdfs
     in the submission directory.
     """
-    from pypdf import PdfReader
-
-    def write_to_file(f, string):
-        f.write(textwrap.dedent(string))
-
     logging.info("Generating .xopp files...")
-    for submission in sheet.get_relevant_submissions():
-        feedback_dir = submission.get_feedback_dir()
-        pdf_paths = list(submission.root_dir.glob("*.pdf"))
-        if len(pdf_paths) > 1:
-            logging.warning(
-                "There are multiple PDFs in the submission directory "
-                f"{submission.root_dir}."
-            )
-        for pdf_path in pdf_paths:
-            file_name = pdf_path.name
-            if len(pdf_paths) == 1:
-                file_name = sheet.get_feedback_file_name(_the_config) + ".pdf"
-            pages = PdfReader(pdf_path).pages
-            xopp_path = (feedback_dir / file_name).with_suffix(".xopp")
-            if xopp_path.is_file():
-                logging.warning(
-                    "Skipping .xopp file generation for "
-                    f"{submission.root_dir.name}: xopp file exists."
-                )
-                continue
-            xopp_file = open(xopp_path, "w", encoding="utf-8")
-            for i, page in enumerate(pages, start=1):
-                width = page.mediabox.width
-                height = page.mediabox.height
-                if i == 1:  # Special entry for first page
-                    write_to_file(
-                        xopp_file,
-                        f"""\
-                        <?xml version="1.0" standalone="no"?>
-                        <xournal creator="Xournal++ 1.1.1" fileversion="4">
-                        <title>Xournal++ document - see https://github.com/xournalpp/xournalpp</title>
-                        <page width="{width}" height="{height}">
-                        <background type="pdf" domain="absolute" filename="{pdf_path.resolve()}" pageno="{i}"/>
-                        <layer/>
-                        </page>""",  # noqa
-                    )
-                else:
-                    write_to_file(
-                        xopp_file,
-                        f"""\
-                        <page width="{width}" height="{height}">
-                        <background type="pdf" pageno="{i}"/>
-                        <layer/>
-                        </page>""",
-                    )
-            write_to_file(xopp_file, "</xournal>")
-            xopp_file.close()
+    feedback_file_name = sheet.get_feedback_file_name(_the_config)
+    # Teams are processed concurrently to overlap reading the PDFs.
+    with ThreadPoolExecutor() as executor:
+        for warnings in executor.map(
+            lambda submission: generate_xopp_files_for_submission(
+                submission, feedback_file_name
+            ),
+            sheet.get_relevant_submissions(),
+        ):
+            for warning in warnings:
+                logging.warning(warning)
     logging.info("Done generating .xopp files.")
 
 
@@ -289,15 +356,23 @@ def print_missing_submissions(
     teams_who_submitted = [
         submission.team for submission in sheet.get_all_team_submission_info()
     ]
-    students_who_submitted = [
-        member for team in teams_who_submitted for member in team.members
-    ]
+    # Teams are equal if they have the same members, and members are equal if
+    # they have the same email address. Index both by email addresses to avoid
+    # comparing every config team to every submission team.
+    teams_who_submitted_keys = {
+        tuple(team.get_emails()) for team in teams_who_submitted
+    }
+    emails_who_submitted = {
+        email for team in teams_who_submitted for email in team.get_emails()
+    }
     # Also checks if the team has been restructured
     missing_teams = [
         team
         for team in _the_config.teams
-        if team not in teams_who_submitted
-        and not any(member in students_who_submitted for member in team.members)
+        if tuple(team.get_emails()) not in teams_who_submitted_keys
+        and not any(
+            email in emails_who_submitted for email in team.get_emails()
+        )
     ]
     if missing_teams:
         logging.info("There are no submissions for the following team(s):")
@@ -415,13 +490,13 @@ def use_names_from_config(
                 ]
 
 
-def init(_the_config: config.Config, args) -> None:
+def validate_init_arguments(_the_config: config.Config, args) -> None:
     """
-    Prepares the directory structure holding the submissions.
+    Catch wrong combinations of marking_mode/points_per/-n/-e and an existing
+    target directory before any file is extracted. The former is not possible
+    while parsing the arguments because marking_mode and points_per are given
+    by the config file.
     """
-    # Catch wrong combinations of marking_mode/points_per/-n/-e.
-    # Not possible earlier because marking_mode and points_per are given by the
-    # config file.
     if _the_config.points_per == "exercise":
         if _the_config.marking_mode == "exercise" and not args.exercises:
             logging.critical(
@@ -447,6 +522,20 @@ def init(_the_config: config.Config, args) -> None:
                 "'points_per' is 'sheet', so the flags '-n' and '-e' are "
                 "ignored."
             )
+    # Without a target, the directory is named after the sheet in the zip, so
+    # it can only be checked after extracting.
+    if args.target and pathlib.Path(args.target).exists():
+        logging.critical(
+            f"Extraction failed because the path '{args.target}' exists"
+            " already!"
+        )
+
+
+def init(_the_config: config.Config, args) -> None:
+    """
+    Prepares the directory structure holding the submissions.
+    """
+    validate_init_arguments(_the_config, args)
 
     # Sort the list exercises of flag "-e" to make printing nicer later.
     if args.exercises:
@@ -111,7 +111,8 @@ def mark(_the_config: config.Config, args) -> None:
         )
     suffix_to_mark = ".xopp" if has_xopp else ".pdf"
 
-    submissions_to_mark = list(sheet.get_relevant_submissions())
+    relevant_submissions = list(sheet.get_relevant_submissions())
+    submissions_to_mark = relevant_submissions
     if not submissions_to_mark:
         logging.info("There are no submissions that you have to mark.")
         return
@@ -133,7 +134,7 @@ def mark(_the_config: config.Config, args) -> None:
         return
     logging.info(
         f"{submissions_total} out of "
-        f"{len(list(sheet.get_relevant_submissions()))} "
+        f"{len(relevant_submissions)} "
         f"submission{'s'[: submissions_total ^ 1]} to mark."
     )
 
@@ -3,10 +3,13 @@ import mimetypes
 import os
 import pathlib
 import smtplib
+import socket
 import textwrap
+import time
 
 from email.message import EmailMessage
 from getpass import getpass
+from typing import Optional
 
 from .. import config, errors, sheets, strings, utils
 
@@ -94,46 +97,114 @@ def print_emails(emails: list[EmailMessage]) -> None:
     )
 
 
+SMTP_CONNECT_TIMEOUT = 30
+SMTP_MAX_RECONNECTS = 3
+
+
+def connect_to_smtp_server(
+    _the_config: config.Config, password: Optional[str]
+) -> smtplib.SMTP:
+    """
+    Connect and log in to the SMTP server. The timeout only applies to
+    establishing the connection, uploading large attachments may take longer.
+    """
+    smtp = smtplib.SMTP(
+        _the_config.smtp_url,
+        _the_config.smtp_port,
+        timeout=SMTP_CONNECT_TIMEOUT,
+    )
+    try:
+        smtp.sock.settimeout(None)
+        # Don't let Nagle's algorithm hold back small SMTP commands.
+        smtp.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        smtp.starttls()
+        if password is not None:
+            smtp.login(_the_config.smtp_user, password)
+    except BaseException:
+        smtp.close()
+        raise
+    return smtp
+
+
 def send_messages(
     emails: list[EmailMessage], _the_config: config.Config
 ) -> None:
-    with smtplib.SMTP(_the_config.smtp_url, _the_config.smtp_port) as smtp:
-        smtp.starttls()
-        if _the_config.smtp_user:
-            logging.warning(
-                "The setting 'smtp_user' should probably be empty for the"
-                " 'send' command to work, trying anyway."
-            )
-            password = getpass("Email password: ")
-            smtp.login(_the_config.smtp_user, password)
+    password = None
+    if _the_config.smtp_user:
+        logging.warning(
+            "The setting 'smtp_user' should probably be empty for the"
+            " 'send' command to work, trying anyway."
+        )
+        password = getpass("Email password: ")
+    try:
+        smtp = connect_to_smtp_server(_the_config, password)
+    except OSError as error:
+        logging.critical(
+            "Could not connect to the SMTP server, failed to deliver any"
+            f" emails: {error}"
+        )
+    try:
         for email in emails:
             logging.info(f"Sending email to {email['To']}")
+            refused_recipients = {}
             # During testing, I didn't manage to trigger the exceptions below.
             # Additionally `refused_recipients` was always empty, even when the
             # documentation of smtplib states that it should be populated when
             # some but not all of the recipients are refused. Instead I always
             # get receive an email from the Outlook server containing the error
             # message.
-            try:
-                refused_recipients = smtp.send_message(email)
-            except smtplib.SMTPRecipientsRefused:
-                logging.warning(
-                    f"Email to '{email['To']}' failed to deliver because all"
-                    " recipients were refused."
-                )
-            except smtplib.SMTPSenderRefused:
-                logging.critical(
-                    "Email sender was refused, failed to deliver any emails."
-                )
-            except (
-                smtplib.SMTPHeloError,
-                smtplib.SMTPDataError,
-                smtplib.SMTPNotSupportedError,
-            ):
-                logging.warning(
-                    f"Email to '{email['To']}' failed to deliver because of"
-                    " some weird error."
-                )
+            for attempt in range(SMTP_MAX_RECONNECTS + 1):
+                try:
+                    if smtp is None:
+                        smtp = connect_to_smtp_server(_the_config, password)
+                    refused_recipients = smtp.send_message(email)
+                    break
+                except smtplib.SMTPRecipientsRefused:
+                    logging.warning(
+                        f"Email to '{email['To']}' failed to deliver because"
+                        " all recipients were refused."
+                    )
+                    break
+                except smtplib.SMTPSenderRefused:
+                    logging.critical(
+                        "Email sender was refused, failed to deliver any"
+                        " emails."
+                    )
+                except (
+                    smtplib.SMTPHeloError,
+                    smtplib.SMTPDataError,
+                    smtplib.SMTPNotSupportedError,
+                ):
+                    logging.warning(
+                        f"Email to '{email['To']}' failed to deliver because"
+                        " of some weird error."
+                    )
+                    break
+                except OSError as error:
+                    # The connection was lost or could not be established
+                    # again. This includes smtplib.SMTPServerDisconnected and
+                    # timeouts while connecting. smtplib does not tell whether
+                    # the server had already accepted the message when the
+                    # connection dropped, so in rare cases the retry delivers
+                    # an email twice. We prefer that over silently losing
+                    # feedback.
+                    if smtp is not None:
+                        smtp.close()
+                        smtp = None
+                    if attempt == SMTP_MAX_RECONNECTS:
+                        logging.critical(
+                            "Lost the connection to the SMTP server, failed to"
+                            f" deliver the email to '{email['To']}' and all"
+                            f" following emails: {error}"
+                        )
+                    delay = 2**attempt
+                    logging.warning(
+                        "Lost the connection to the SMTP server while sending"
+                        f" the email to '{email['To']}', reconnecting in"
+                        f" {delay} second(s). If the server had accepted the"
+                        " email already, it will be delivered twice."
+                    )
+                    time.sleep(delay)
             for refused_recipient, (
                 smtp_error,
                 error_message,
@@ -143,7 +214,16 @@ def send_messages(
                     " the recipient was refused with the SMTP error code"
                     f" '{smtp_error}' and the message '{error_message}'."
                 )
+        try:
+            smtp.quit()
+        except smtplib.SMTPServerDisconnected:
+            # All emails were sent, the server just closed the connection
+            # before we could say goodbye.
+            pass
         logging.info("Done sending emails.")
+    finally:
+        if smtp is not None:
+            smtp.close()
 
 
 def get_team_email_subject(
@@ -169,8 +249,7 @@ def get_email_greeting(name_list: list[str]) -> str:
     Builds the first line of the email.
     """
     # Only keep one name per entry, "Hans Jakob" becomes "Hans".
-    name_list = [name.split(" ")[0] for name in name_list]
-    name_list.sort()
+    name_list = sorted(name.split(" ", 1)[0] for name in name_list)
     assert len(name_list) > 0
     if len(name_list) == 1:
         names = name_list[0]
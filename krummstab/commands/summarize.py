@@ -768,7 +768,7 @@ def load_marks_files(marks_dir: Path, _the_config: config.Config):
     )
     if _the_config.points_per == "exercise":
         students_marks = defaultdict(lambda: defaultdict(dict))
-        graded_sheet_names = defaultdict(list)
+        graded_sheet_names = defaultdict(set)
     else:
         students_marks = defaultdict(dict)
         graded_sheet_names = set()
@@ -789,8 +789,7 @@ def load_marks_files(marks_dir: Path, _the_config: config.Config):
                     students_marks[email][sheet_name][exercise] = (
                         utils.make_lower_case_if_possible(mark)
                     )
-                    if exercise not in graded_sheet_names[sheet_name]:
-                        graded_sheet_names[sheet_name].append(exercise)
+                    graded_sheet_names[sheet_name].add(exercise)
         else:
             graded_sheet_names.add(sheet_name)
             for email, mark in marks.items():
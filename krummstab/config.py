@@ -1,10 +1,9 @@
 import logging
 
-from importlib import resources
 from pathlib import Path
 from collections import defaultdict
 
-from . import errors, schemas, utils
+from . import errors, utils
 from .teams import Team
 from .students import Student
 
@@ -21,13 +20,7 @@ class Config:
                 data.update(utils.read_json(path))
             except FileNotFoundError:
                 logging.warning(f"File '{path}' is missing.")
-        config_schema = utils.read_json(
-            resources.read_text(
-                schemas, "config-schema.json", encoding="utf-8"
-            ),
-            "config-schema.json",
-        )
-        utils.validate_json(data, config_schema, "The config")
+        utils.validate_json(data, "config-schema.json", "The config")
 
         for key, value in data.items():
             setattr(self, key, value)
@@ -58,19 +51,19 @@ class Config:
         self.teams.sort()
 
         # Create Team objects with their adam_id set to None because
-        # the adam_id is not available here
+        # the adam_id is not available here. In static mode, self.teams holds
+        # the same team lists as self.classes, so each team is only converted
+        # once and both share the resulting Team object.
+        team_objects = {
+            id(team): Team([Student(*student) for student in team], None)
+            for team in self.teams
+        }
         if self.marking_mode == "static":
             self.classes = {
-                tutor: [
-                    Team([Student(*student) for student in team], None)
-                    for team in teams
-                ]
+                tutor: [team_objects[id(team)] for team in teams]
                 for tutor, teams in self.classes.items()
             }
-        self.teams = [
-            Team([Student(*student) for student in team], None)
-            for team in self.teams
-        ]
+        self.teams = [team_objects[id(team)] for team in self.teams]
         _validate_teams(self.teams, self.max_team_size)
         logging.info("Processed config successfully.")
 
@@ -99,8 +92,10 @@ def _validate_teams(teams: list[Team], max_team_size) -> None:
     """
     Check for duplicate entries and maximal team size.
     """
-    all_students: list[tuple[str, str]] = []
-    all_emails: list[str] = []
+    seen_students: set[tuple[str, str]] = set()
+    seen_emails: set[str] = set()
+    duplicate_students: list[tuple[str, str]] = []
+    duplicate_emails: list[str] = []
     for team in teams:
         if len(team.members) > max_team_size:
             logging.critical(
@@ -108,21 +103,20 @@ def _validate_teams(teams: list[Team], max_team_size) -> None:
                 "size."
             )
         for member in team.members:
-            all_students.append((member.first_name, member.last_name))
-            all_emails.append(member.email)
-    if len(all_students) != len(set(all_students)):
-        duplicates = [
-            student
-            for student in set(all_students)
-            if all_students.count(student) > 1
-        ]
+            student = (member.first_name, member.last_name)
+            if student in seen_students:
+                duplicate_students.append(student)
+            seen_students.add(student)
+            if member.email in seen_emails:
+                duplicate_emails.append(member.email)
+            seen_emails.add(member.email)
+    if duplicate_students:
         logging.critical(
-            f"There are duplicate students in the config file: {duplicates}"
+            "There are duplicate students in the config file: "
+            f"{duplicate_students}"
         )
-    if len(all_emails) != len(set(all_emails)):
-        duplicates = [
-            email for email in set(all_emails) if all_emails.count(email) > 1
-        ]
+    if duplicate_emails:
         logging.critical(
-            f"There are duplicate student emails in the config file: {duplicates}"
+            "There are duplicate student emails in the config file: "
+            f"{duplicate_emails}"
         )
@@ -1,8 +1,8 @@
 import argparse
+import importlib
 import pathlib
 
 from . import strings
-from .commands import check, collect, combine, init, mark, send, summarize
 
 
 def add_parsers() -> argparse.ArgumentParser:
@@ -20,6 +20,27 @@ def add_parsers() -> argparse.ArgumentParser:
     return parser
 
 
+def import_command(name: str):
+    """
+    Import the module implementing the command with the given name and return
+    the function of the same name defined in it.
+    """
+    module = importlib.import_module(f"{__package__}.commands.{name}")
+    return getattr(module, name)
+
+
+def get_command_function(name: str):
+    """
+    Return a function that runs the command with the given name. The module
+    implementing the command is only imported when the function is called.
+    """
+
+    def run_command(_the_config, args) -> None:
+        import_command(name)(_the_config, args)
+
+    return run_command
+
+
 def add_sheet_root_dir_argument(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "sheet_root_dir",
@@ -125,7 +146,7 @@ def add_init_command_parser(
         ),
     )
     add_adam_zip_path_argument(parser_init)
-    parser_init.set_defaults(func=init)
+    parser_init.set_defaults(func=get_command_function("init"))
 
 
 def add_mark_command_parser(
@@ -154,7 +175,7 @@ def add_mark_command_parser(
         help="do not skip submissions with marks in the points file",
     )
     add_sheet_root_dir_argument(parser_mark)
-    parser_mark.set_defaults(func=mark)
+    parser_mark.set_defaults(func=get_command_function("mark"))
 
 
 def add_collect_command_parser(
@@ -165,7 +186,7 @@ def add_collect_command_parser(
         help="collect feedback files after marking is done",
     )
     add_sheet_root_dir_argument(parser_collect)
-    parser_collect.set_defaults(func=collect)
+    parser_collect.set_defaults(func=get_command_function("collect"))
 
 
 def add_combine_command_parser(
@@ -180,7 +201,7 @@ def add_combine_command_parser(
         ),
     )
     add_sheet_root_dir_argument(parser_combine)
-    parser_combine.set_defaults(func=combine)
+    parser_combine.set_defaults(func=get_command_function("combine"))
 
 
 def add_send_command_parser(
@@ -197,7 +218,7 @@ def add_send_command_parser(
         help="only print emails instead of sending them",
     )
     add_sheet_root_dir_argument(parser_send)
-    parser_send.set_defaults(func=send)
+    parser_send.set_defaults(func=get_command_function("send"))
 
 
 def add_summarize_command_parser(
@@ -212,7 +233,7 @@ def add_summarize_command_parser(
         type=pathlib.Path,
         help="path to the directory with all individual marks files",
     )
-    parser_summarize.set_defaults(func=summarize)
+    parser_summarize.set_defaults(func=get_command_function("summarize"))
 
 
 def add_check_command_parser(
@@ -223,4 +244,4 @@ def add_check_command_parser(
         help="check whether marking assignment is balanced",
     )
     add_adam_zip_path_argument(parser_check)
-    parser_check.set_defaults(func=check)
+    parser_check.set_defaults(func=get_command_function("check"))
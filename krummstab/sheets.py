@@ -1,7 +1,7 @@
 from collections.abc import Iterator
 from pathlib import Path
 import logging
-import json
+import os
 
 from . import config, errors, submissions, strings, utils
 
@@ -15,18 +15,23 @@ class Sheet:
                 f"'{sheet_root_dir}'. Use the command 'init' to set it up."
             )
         self.root_dir = sheet_root_dir
+        # Submissions that have already been loaded, by team directory. The
+        # submission info of a team directory does not change once the sheet
+        # exists, only team directories get renamed.
+        self._submissions: dict[Path, submissions.Submission] = {}
         self._load()
 
     def _load(self):
         sheet_info = utils.read_json(self._sheet_info_path)
         self.name = sheet_info.get("adam_sheet_name")
         self.exercises = sheet_info.get("exercises")
+        self._adam_sheet_name_string = self.name.replace(" ", "_").lower()
 
     def get_adam_sheet_name_string(self) -> str:
         """
         Turn the sheet name given by ADAM into a string usable for file names.
         """
-        return self.name.replace(" ", "_").lower()
+        return self._adam_sheet_name_string
 
     def get_feedback_file_name(self, _the_config: config.Config) -> str:
         file_name = (
@@ -72,14 +77,28 @@ class Sheet:
     def get_all_team_submission_info(self) -> Iterator[submissions.Submission]:
         """
         Return all team submission info. Exclude other directories that may be created
-        in the sheet root directory, such as one containing combined feedback.
+        in the sheet root directory, such as one containing combined feedback
+        or a staging directory left behind by an interrupted move.
+        The submission info file of each team directory is only read once.
         """
-        for sub_dir in self.root_dir.iterdir():
-            if (
-                sub_dir.is_dir()
-                and sub_dir != self.get_combined_feedback_path()
-            ):
-                yield submissions.Submission(sub_dir)
+        combined_feedback_path = self.get_combined_feedback_path()
+        # Use os.scandir to get the file types without a stat call per entry.
+        # The team directories are listed up front, because callers may rename
+        # them while iterating.
+        with os.scandir(self.root_dir) as entries:
+            sub_dirs = [
+                Path(entry.path)
+                for entry in entries
+                if entry.is_dir()
+                and not entry.name.startswith(utils.STAGING_DIR_PREFIX)
+            ]
+        for sub_dir in sub_dirs:
+            if sub_dir != combined_feedback_path:
+                submission = self._submissions.get(sub_dir)
+                if submission is None:
+                    submission = submissions.Submission(sub_dir, self)
+                    self._submissions[sub_dir] = submission
+                yield submission
 
     def get_relevant_submissions(self) -> Iterator[submissions.Submission]:
         """
@@ -126,14 +145,7 @@ def create_sheet_info_file(
     info_dict["adam_sheet_name"] = adam_sheet_name
     if _the_config.marking_mode == "exercise":
         info_dict["exercises"] = exercises
-    with open(
-        sheet_root_dir / strings.SHEET_INFO_FILE_NAME, "w", encoding="utf-8"
-    ) as sheet_info_file:
-        json.dump(
-            info_dict,
-            sheet_info_file,
-            indent=4,
-            ensure_ascii=False,
-            sort_keys=True,
-        )
+    utils.write_json(
+        sheet_root_dir / strings.SHEET_INFO_FILE_NAME, info_dict, sort_keys=True
+    )
     return Sheet(sheet_root_dir=sheet_root_dir)
@@ -1,17 +1,18 @@
-import json
 import logging
-from importlib import resources
 from pathlib import Path
+from typing import Optional
 
-from . import config, schemas, sheets, strings, utils
+from . import config, sheets, strings, utils
 from .students import Student
 from .teams import Team
 
 
 class Submission:
-    def __init__(self, team_dir: Path):
+    def __init__(self, team_dir: Path, sheet: Optional["sheets.Sheet"] = None):
         self.root_dir = team_dir
-        self.sheet = sheets.Sheet(self.root_dir.parent)
+        # Reuse the sheet of the caller if possible instead of reading the
+        # sheet info file again for every team directory.
+        self.sheet = sheet if sheet else sheets.Sheet(self.root_dir.parent)
         self._load()
 
     def get_feedback_dir(self) -> Path:
@@ -76,15 +77,9 @@ class Submission:
                 self.root_dir / strings.SUBMISSION_INFO_FILE_NAME
             )
             submission_info = utils.read_json(submission_info_file)
-            submission_info_schema = utils.read_json(
-                resources.read_text(
-                    schemas, "submission-info-schema.json", encoding="utf-8"
-                ),
-                "submission-info-schema.json",
-            )
             utils.validate_json(
                 submission_info,
-                submission_info_schema,
+                "submission-info-schema.json",
                 str(submission_info_file),
             )
             self.team = Team(
@@ -120,12 +115,6 @@ def create_submission_info_file(
     submission_info.update({"team": team_tuples})
     submission_info.update({"adam_id": team.adam_id})
     submission_info.update({"relevant": is_relevant})
-    with open(
-        team_dir / strings.SUBMISSION_INFO_FILE_NAME, "w", encoding="utf-8"
-    ) as submission_info_file:
-        json.dump(
-            submission_info,
-            submission_info_file,
-            indent=4,
-            ensure_ascii=False,
-        )
+    utils.write_json(
+        team_dir / strings.SUBMISSION_INFO_FILE_NAME, submission_info
+    )
@@ -38,6 +38,8 @@ class Team:
         """
         Create a string representation of the team with the ADAM ID:
         team_id_LastName1-LastName2
+        The key is computed from the current members, because their names may
+        be replaced by the names from the config after construction.
         """
         if not self.adam_id:
             logging.critical(
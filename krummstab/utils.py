@@ -1,6 +1,7 @@
+import functools
 import json
 import logging
-import openpyxl
+import os
 import pathlib
 import shutil
 import sys
@@ -8,9 +9,13 @@ import tempfile
 import jsonschema
 
 from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from importlib import resources
 from typing import Any
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
+from . import schemas
 from .students import Student
 from .teams import Team
 
@@ -50,6 +55,8 @@ def read_teams_from_adam_spreadsheet(file: pathlib.Path) -> dict[str, Team]:
     Reads the teams from the ADAM Excel spreadsheet and returns a dictionary
     with the team IDs as keys and the teams as values.
     """
+    import openpyxl
+
     assert file.is_file()
     wb = openpyxl.load_workbook(file)
     sheet = wb.active
@@ -76,6 +83,11 @@ def read_teams_from_adam_spreadsheet(file: pathlib.Path) -> dict[str, Team]:
 
 
 def configure_logging(level=logging.INFO):
+    # Might be necessary to make colored output work on Windows. Elsewhere,
+    # this would only start a shell for nothing.
+    if sys.platform == "win32":
+        os.system("")
+
     class ColoredFormatter(logging.Formatter):
         FORMATS = {
             logging.DEBUG: "\033[0;37m[{levelname}]\033[0m {message}",
@@ -85,11 +97,13 @@ def configure_logging(level=logging.INFO):
             logging.CRITICAL: "\033[0;31m[{levelname}]\033[0m {message}",
         }
 
+        FORMATTERS = {
+            level: logging.Formatter(log_format, style="{")
+            for level, log_format in FORMATS.items()
+        }
+
         def format(self, record):
-            formatter = logging.Formatter(
-                ColoredFormatter.FORMATS[record.levelno], style="{"
-            )
-            return formatter.format(record)
+            return ColoredFormatter.FORMATTERS[record.levelno].format(record)
 
     class LevelFilter:
         def __init__(self, min_level, max_level):
@@ -130,17 +144,16 @@ def query_yes_no(text: str, default: bool = True) -> bool:
     """
     valid = {"yes": True, "y": True, "ye": True, "no": False, "n": False}
     options = "[Y/n]" if default else "[y/N]"
-    print("\033[0;35m[Query]\033[0m " + text + f" {options}")
-    choice = input().lower()
-    if choice == "":
-        return default
-    elif choice in valid:
-        return valid[choice]
-    else:
+    while True:
+        print("\033[0;35m[Query]\033[0m " + text + f" {options}")
+        choice = input().lower()
+        if choice == "":
+            return default
+        elif choice in valid:
+            return valid[choice]
         logging.warning(
             f"Invalid choice '{choice}'. Please respond with 'yes' or 'no'."
         )
-        return query_yes_no(text, default)
 
 
 # JSON parsing -------------------------------------------------------
@@ -148,16 +161,16 @@ def query_yes_no(text: str, default: bool = True) -> bool:
 
 def validate_json(
     data: dict,
-    schema: dict,
+    schema_file_name: str,
     source: str = "file",
     schema_version=jsonschema.Draft7Validator,
 ) -> None:
     """
-    Validates a JSON object against a given schema.
+    Validates a JSON object against one of the schemas shipped with Krummstab.
     """
-    try:
-        jsonschema.validate(data, schema, schema_version)
-    except jsonschema.exceptions.ValidationError as error:
+    validator = get_schema_validator(schema_file_name, schema_version)
+    error = jsonschema.exceptions.best_match(validator.iter_errors(data))
+    if error is not None:
         logging.critical(
             f"Validation error: {source} does not have the right format: "
             f"{error.message}"
@@ -181,8 +194,61 @@ def read_json(source: str | pathlib.Path, source_name: str = "file") -> dict:
     return data
 
 
+def write_json(path: pathlib.Path, data: dict, sort_keys: bool = False) -> None:
+    """
+    Writes data to a JSON file. The JSON string is built in memory first and
+    then written with a single call, instead of json.dump issuing a separate
+    write for each encoded chunk.
+    """
+    path.write_text(
+        json.dumps(data, indent=4, ensure_ascii=False, sort_keys=sort_keys),
+        encoding="utf-8",
+    )
+
+
+@functools.cache
+def read_schema(file_name: str) -> dict:
+    """
+    Reads one of the JSON schemas shipped with Krummstab. The result is cached,
+    so every schema is read and parsed at most once per run and the returned
+    dictionary must not be modified.
+    """
+    return read_json(
+        resources.files(schemas)
+        .joinpath(file_name)
+        .read_text(encoding="utf-8"),
+        file_name,
+    )
+
+
+@functools.cache
+def get_schema_validator(
+    schema_file_name: str, schema_version=jsonschema.Draft7Validator
+) -> jsonschema.protocols.Validator:
+    """
+    Builds a validator for one of the schemas shipped with Krummstab. The schema
+    itself is checked against its meta-schema only once, when the validator is
+    first built, instead of on every validation as jsonschema.validate does.
+    """
+    schema = read_schema(schema_file_name)
+    schema_version.check_schema(schema)
+    # Formats such as "email" are only annotations in our schemas, so no
+    # format checker is attached.
+    return schema_version(schema, format_checker=None)
+
+
 # File handling ----------------------------------------------------------------
 
+COMPRESSED_FILE_SUFFIXES = frozenset(
+    [".pdf", ".png", ".jpg", ".jpeg", ".zip", ".docx", ".xlsx", ".mp4"]
+)
+MACOS_HELPER_NAMES = frozenset(["__MACOSX", ".DS_Store"])
+# Buffer size for files that zip archives are written to. zipfile writes the
+# compressed data in many small chunks, this coalesces them into fewer writes.
+ZIP_WRITE_BUFFER_SIZE = 1 << 20
+# Prefix of temporary directories that are created while moving files.
+STAGING_DIR_PREFIX = ".krummstab-"
+
 
 def is_hidden_path(path: pathlib.Path) -> bool:
     """
@@ -203,34 +269,106 @@ def is_superfluous_macos_path(path: pathlib.Path) -> bool:
     .DS_Store created by Finder or __MACOSX folders created when creating zip
     archives.
     """
-    return any(
-        part == magic_string
-        for part in path.parts
-        for magic_string in ["__MACOSX", ".DS_Store"]
-    )
+    return not MACOS_HELPER_NAMES.isdisjoint(path.parts)
+
+
+def iterate_files(
+    directory: pathlib.Path, skip_hidden: bool = False
+) -> Iterator[pathlib.Path]:
+    """
+    Recursively yield all files within the given directory. Unlike Path.rglob
+    followed by Path.is_file, os.scandir gets the file type when reading the
+    directory, which saves a stat call per entry.
+    If `skip_hidden` is set, hidden files are left out and hidden directories
+    are not descended into at all.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if skip_hidden and is_hidden_path(pathlib.Path(entry.name)):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from iterate_files(pathlib.Path(entry.path), skip_hidden)
+            elif entry.is_file():
+                yield pathlib.Path(entry.path)
 
 
 def filtered_extract(zip_file: ZipFile, dest: pathlib.Path) -> None:
     """
     Extract all files except for MACOS helper files.
     """
-    zip_content = zip_file.namelist()
-    for file_str in zip_content:
-        if is_superfluous_macos_path(pathlib.Path(file_str)):
-            continue
-        zip_file.extract(file_str, dest)
+    members = [
+        member
+        for member in zip_file.infolist()
+        if not is_superfluous_macos_path(pathlib.Path(member.filename))
+    ]
+    zip_file.extractall(dest, members=members)
+
+
+def get_zip_compress_type(path: pathlib.Path) -> int:
+    """
+    Choose the compression method for adding a file to a zip archive. Files in
+    formats that are compressed already, such as PDFs, are stored as they are
+    because deflating them again costs time without making them smaller.
+    """
+    if path.suffix.lower() in COMPRESSED_FILE_SUFFIXES:
+        return ZIP_STORED
+    return ZIP_DEFLATED
+
+
+def copy_file(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """
+    Copy a file like shutil.copy does. Where available, os.copy_file_range
+    lets the kernel copy the data, which on copy-on-write file systems can
+    share the data blocks instead of duplicating them. Falls back to
+    shutil.copy if that is not possible.
+    """
+    if dst.is_dir():
+        dst = dst / src.name
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+                remaining = os.fstat(src_file.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(
+                        src_file.fileno(), dst_file.fileno(), remaining
+                    )
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                shutil.copymode(src, dst)
+                return
+        except OSError:
+            pass
+    shutil.copy(src, dst)
 
 
 def move_content_and_delete(src: pathlib.Path, dst: pathlib.Path) -> None:
     """
     Move all content of source directory to destination directory.
     This does not complain if the dst directory already exists.
+    The source is usually a subdirectory of the destination and may contain an
+    entry with its own name, so it is first moved out of the way. Its entries
+    are then renamed into place, and only copied if the destination already
+    has an entry of the same name that they need to be merged with.
+    The staging directory is a hidden directory within the destination, such
+    that an interrupted move does not leave a directory next to it that could
+    be mistaken for a team directory.
     """
     assert src.is_dir() and dst.is_dir()
-    with tempfile.TemporaryDirectory() as temp_dir:
-        shutil.copytree(src, temp_dir, dirs_exist_ok=True)
-        shutil.rmtree(src)
-        shutil.copytree(temp_dir, dst, dirs_exist_ok=True)
+    with tempfile.TemporaryDirectory(
+        prefix=STAGING_DIR_PREFIX, dir=dst
+    ) as temp_dir:
+        staged_src = pathlib.Path(temp_dir) / src.name
+        src.rename(staged_src)
+        for entry in staged_src.iterdir():
+            target = dst / entry.name
+            if not os.path.lexists(target):
+                entry.rename(target)
+            elif entry.is_dir():
+                shutil.copytree(entry, target, dirs_exist_ok=True)
+            else:
+                shutil.copy2(entry, target)
 
 
 def unzip_or_move_adam_zip(
@@ -248,11 +386,31 @@ def unzip_or_move_adam_zip(
             filtered_extract(zip_file, destination)
     else:
         # Assume the directory is an extracted ADAM zip.
-        unzipped_path = pathlib.Path(adam_zip_path)
         unzipped_destination_path = (
-            pathlib.Path(destination) / unzipped_path.name
+            pathlib.Path(destination) / adam_zip_path.name
         )
-        shutil.copytree(unzipped_path, unzipped_destination_path)
+        shutil.copytree(adam_zip_path, unzipped_destination_path)
+
+
+# Concurrency ------------------------------------------------------------------
+
+
+def run_concurrently(function: Callable, items: Iterable) -> list:
+    """
+    Call `function` on all items using a thread pool and return the results in
+    the order of the items. As soon as one call raises an exception, including
+    the exit triggered by critical log messages, calls that have not started
+    yet are cancelled, and the exception is re-raised once the running calls
+    have finished.
+    """
+    with ThreadPoolExecutor() as executor:
+        futures = [executor.submit(function, item) for item in items]
+        _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        if not_done:
+            executor.shutdown(cancel_futures=True)
+        # Calls are started in order, so cancelled calls only come after the
+        # one that failed.
+        return [future.result() for future in futures]
 
 
 # Type juggling ----------------------------------------------------------------
@@ -262,3 +262,85 @@ def test(
         "Command 'summarize' terminated successfully." in out
         and len(list(pathlib.Path.cwd().glob("*.xlsx"))) == 1
     )
+
+
+def test_lazy_command_lookup():
+    import krummstab.commands.init
+    from krummstab import commands, parsers
+
+    # Looking up a command must return its function, also if the module was
+    # imported before and when it is looked up repeatedly.
+    for name in commands.__all__:
+        assert callable(parsers.import_command(name))
+        assert callable(parsers.import_command(name))
+    assert parsers.import_command("init") is krummstab.commands.init.init
+
+
+@pytest.mark.parametrize(
+    "mode_dict",
+    [
+        {
+            "config_shared": CONFIG_STATIC,
+            "individual_point_file_dir": SAMPLE_INDIVIDUAL_POINTS_FILES_DIR_STATIC,
+        }
+    ],
+    indirect=True,
+)
+def test_init_target_with_missing_parent(capfd, mode_dict: dict):
+    with open("config-individual.json", "r") as f:
+        filled_in = (
+            f.read()
+            .replace("PLACEHOLDER_NAME", "tamara")
+            .replace("PLACEHOLDER_XOPP_SETTING", "false")
+            .replace("PLACEHOLDER_MARKING_COMMAND", '["ls", "{all_pdf_files}"]')
+        )
+    with open("config-individual.json", "w") as f:
+        f.write(filled_in)
+    target = pathlib.Path("new_dir") / "sheet"
+    subprocess.check_call(
+        [
+            "krummstab",
+            "-i",
+            str(CONFIG_INDIVIDUAL),
+            "-s",
+            str(mode_dict["config_shared"]),
+            "init",
+            "-t",
+            str(target),
+            str(SAMPLE_SHEET),
+        ]
+    )
+    out, err = capfd.readouterr()
+    assert "Command 'init' terminated successfully." in out
+    assert target.is_dir()
+
+
+def test_team_after_using_names_from_config():
+    from krummstab.commands.init import use_names_from_config
+    from krummstab.students import Student
+    from krummstab.teams import Team
+
+    submission_team = Team(
+        [
+            Student("Hans", "Muster", "hans.muster@unibas.ch"),
+            Student("Anna", "Meier", "anna.meier@unibas.ch"),
+        ],
+        "12345",
+    )
+    assert submission_team.get_team_key() == "12345_Meier_Muster"
+    config_team = Team(
+        [
+            Student("Hans", "Mustermann", "hans.muster@unibas.ch"),
+            Student("Anna", "Meier", "anna.meier@unibas.ch"),
+        ]
+    )
+    use_names_from_config([config_team], {"12345": submission_team})
+    assert submission_team.get_team_key() == "12345_Meier_Mustermann"
+    assert submission_team == config_team
+    submission_team.members.append(
+        Student("Eva", "Adler", "eva.adler@unibas.ch")
+    )
+    config_team.members.insert(
+        0, Student("Eva", "Adler", "eva.adler@unibas.ch")
+    )
+    assert submission_team == config_team